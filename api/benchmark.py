@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit, urlencode
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+from server import make_server, DB_PATH
+
+def percentile(values, pct):
+    """Returns the pct-th percentile of a list of numbers (nearest rank)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+class Client:
+    """A keep-alive HTTP client that remembers ETags for conditional requests."""
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        self.etags = {}
+
+    def get(self, path, conditional=False):
+        headers = {}
+        if conditional and path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        try:
+            self.conn.request('GET', path, headers=headers)
+            response = self.conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # Reconnect once if the server closed the keep-alive connection
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self.conn.request('GET', path, headers=headers)
+            response = self.conn.getresponse()
+        body = response.read()
+        if response.getheader('ETag'):
+            self.etags[path] = response.getheader('ETag')
+        return response.status, response.getheader('X-Next-Cursor'), body
+
+def build_workload(meta, requests, page_limit, seed=0):
+    """
+    Builds a random mix of first-page requests over every endpoint, filtered
+    by the years, offices and counties the database actually contains.
+    """
+    rng = random.Random(seed)
+    years = meta['years'] or [2024]
+    offices = meta['offices'] or ['USP']
+    counties = list(meta['counties']) or ['01']
+
+    workload = []
+    for _ in range(requests):
+        endpoint = rng.choice(['results', 'results', 'registration', 'rollups'])
+        params = {'year': rng.choice(years), 'limit': page_limit}
+        if endpoint != 'registration' and rng.random() < 0.7:
+            params['office'] = rng.choice(offices)
+        if rng.random() < 0.5:
+            params['county'] = rng.choice(counties)
+        if rng.random() < 0.3:
+            params['format'] = 'ndjson'
+        workload.append((endpoint, f"/{endpoint}?{urlencode(params)}"))
+    return workload
+
+def run_benchmark(base_url, requests, concurrency, page_limit, pages, conditional_ratio):
+    """
+    Issues the workload from `concurrency` threads and prints throughput and
+    latency percentiles per endpoint. Each request walks up to `pages` pages
+    using the keyset cursor; a fraction of requests are repeated with
+    If-None-Match to measure the ETag (304) path.
+    """
+    meta = json.loads(Client(base_url).get('/')[2])
+    workload = build_workload(meta, requests, page_limit)
+    local = threading.local()
+    timings = {}
+    lock = threading.Lock()
+    rng = random.Random(1)
+
+    def record(name, elapsed, status):
+        with lock:
+            timings.setdefault(name, []).append((elapsed, status))
+
+    def work(item):
+        endpoint, path = item
+        if not hasattr(local, 'client'):
+            local.client = Client(base_url)
+        client = local.client
+
+        for page in range(pages):
+            start = time.perf_counter()
+            status, next_cursor, _ = client.get(path)
+            record(endpoint, time.perf_counter() - start, status)
+            if page == 0 and rng.random() < conditional_ratio:
+                start = time.perf_counter()
+                status, _, _ = client.get(path, conditional=True)
+                record(f"{endpoint} (If-None-Match)", time.perf_counter() - start, status)
+            if not next_cursor:
+                break
+            path = f"{path}&{urlencode({'after': next_cursor})}"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(work, workload))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(v) for v in timings.values())
+    print(f"{total} requests in {elapsed:.2f}s with {concurrency} threads: {total / elapsed:.1f} req/s")
+    print(f"{'endpoint':32} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for name in sorted(timings):
+        latencies = [t * 1000 for t, _ in timings[name]]
+        statuses = {}
+        for _, status in timings[name]:
+            statuses[status] = statuses.get(status, 0) + 1
+        print(f"{name:32} {len(latencies):6} {percentile(latencies, 50):8.2f} "
+              f"{percentile(latencies, 95):8.2f} {percentile(latencies, 99):8.2f}  {statuses}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load-test the election query service.')
+    parser.add_argument('--url', help='Base URL of a running service; if omitted one is started in-process')
+    parser.add_argument('--db', default=DB_PATH, help='Database for the in-process server')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--limit', type=int, default=1000, help='Rows per page')
+    parser.add_argument('--pages', type=int, default=3, help='Pages to walk per request')
+    parser.add_argument('--conditional', type=float, default=0.25,
+                        help='Fraction of requests repeated with If-None-Match')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        if not os.path.exists(args.db):
+            sys.exit(f"Database file not found at {args.db}")
+        server = make_server('127.0.0.1', 0, args.db, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        run_benchmark(base_url, args.requests, args.concurrency, args.limit, args.pages, args.conditional)
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,364 @@
+import sqlite3
+import os
+import json
+import base64
+import hashlib
+import argparse
+import queue
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+# Define the path to the SQLite database
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'election_data.db')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8051  # The Dash dashboard runs on 8050
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+
+# Rows are serialized and written to the socket in chunks of this many rows
+STREAM_CHUNK_ROWS = 500
+
+class QueryError(Exception):
+    """Raised for invalid query parameters; reported to the client as HTTP 400."""
+
+# Each endpoint is a base query plus the filters it accepts. Pagination is
+# keyset-based: `key` lists the columns that uniquely order the rows, and the
+# cursor returned with a page holds the key of its last row. For the fact
+# tables that key is the rowid, so every page is a range scan of the
+# clustered index rather than an OFFSET over everything before it.
+ENDPOINTS = {
+    'results': {
+        'sql': """
+        SELECT r.id, e.year, co.county_code, co.name AS county_name, p.precinct_code,
+               p.municipality_name, off.office_code, off.name AS office_name,
+               pa.party_code, ca.candidate_number, ca.first_name, ca.last_name, r.vote_total
+        FROM results r
+        JOIN elections e ON r.election_id = e.id
+        JOIN precincts p ON r.precinct_id = p.id
+        JOIN counties co ON p.county_id = co.id
+        JOIN offices off ON r.office_id = off.id
+        JOIN parties pa ON r.party_id = pa.id
+        JOIN candidates ca ON r.candidate_id = ca.id
+        """,
+        'filters': {
+            'year': "r.election_id IN (SELECT id FROM elections WHERE year = ?)",
+            'office': "r.office_id IN (SELECT id FROM offices WHERE office_code = ?)",
+            'party': "r.party_id IN (SELECT id FROM parties WHERE party_code = ?)",
+            'county': "co.county_code = ?",
+            'precinct': "p.precinct_code = ?",
+        },
+        'key': ['r.id'],
+        'key_names': ['id'],
+    },
+    'registration': {
+        'sql': """
+        SELECT reg.id, e.year, co.county_code, co.name AS county_name, p.precinct_code,
+               p.municipality_name, pa.party_code, reg.registered_voters
+        FROM registration reg
+        JOIN elections e ON reg.election_id = e.id
+        JOIN precincts p ON reg.precinct_id = p.id
+        JOIN counties co ON p.county_id = co.id
+        JOIN parties pa ON reg.party_id = pa.id
+        """,
+        'filters': {
+            'year': "reg.election_id IN (SELECT id FROM elections WHERE year = ?)",
+            'party': "reg.party_id IN (SELECT id FROM parties WHERE party_code = ?)",
+            'county': "co.county_code = ?",
+            'precinct': "p.precinct_code = ?",
+        },
+        'key': ['reg.id'],
+        'key_names': ['id'],
+    },
+    # Votes and registered voters per year, office, county and party, from
+    # the rollups table built at the end of each ingest. Its primary key is
+    # the keyset, so a page is a range scan rather than a re-aggregation.
+    'rollups': {
+        'sql': """
+        SELECT year, office_code, county_code, county_name, party_code, votes, registered_voters
+        FROM rollups
+        """,
+        'filters': {
+            'year': "year = ?",
+            'office': "office_code = ?",
+            'party': "party_code = ?",
+            'county': "county_code = ?",
+        },
+        'key': ['year', 'office_code', 'county_code', 'party_code'],
+        'key_names': ['year', 'office_code', 'county_code', 'party_code'],
+    },
+}
+
+def normalize_filter(name, value):
+    """Validates and normalizes a filter value from the query string."""
+    if name == 'year':
+        if not (value.isascii() and value.isdigit()) or len(value) > 4:
+            raise QueryError(f"Invalid year '{value}'")
+        return int(value)
+    if name == 'county':
+        return value.zfill(2)
+    if name in ('office', 'party'):
+        return value.upper()
+    return value
+
+def encode_cursor(key):
+    """Encodes the key of the last row on a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, key_names):
+    """
+    Decodes a cursor produced by encode_cursor(). Each element must be an int
+    that fits SQLite's 64-bit INTEGER or a str SQLite can encode as UTF-8,
+    and a rowid ('id') key must be an int.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise QueryError(f"Invalid cursor '{cursor}'")
+    if not isinstance(key, list) or len(key) != len(key_names):
+        raise QueryError(f"Invalid cursor '{cursor}'")
+    for name, value in zip(key_names, key):
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise QueryError(f"Invalid cursor '{cursor}'")
+        if name == 'id' and not isinstance(value, int):
+            raise QueryError(f"Invalid cursor '{cursor}'")
+        if isinstance(value, int) and not -2**63 <= value < 2**63:
+            raise QueryError(f"Invalid cursor '{cursor}'")
+        if isinstance(value, str):
+            try:
+                value.encode('utf-8')
+            except UnicodeEncodeError:
+                raise QueryError(f"Invalid cursor '{cursor}'")
+    return key
+
+def build_query(endpoint_name, params):
+    """
+    Builds the SQL and bind parameters for one page of an endpoint.
+    Returns (sql, bind_params, limit).
+    """
+    endpoint = ENDPOINTS[endpoint_name]
+
+    unknown = set(params) - set(endpoint['filters']) - {'after', 'limit', 'format'}
+    if unknown:
+        raise QueryError(f"Unknown parameter(s) for /{endpoint_name}: {', '.join(sorted(unknown))}")
+
+    try:
+        limit = int(params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise QueryError(f"Invalid limit '{params['limit']}'")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise QueryError(f"limit must be between 1 and {MAX_LIMIT}")
+
+    filters = [(name, normalize_filter(name, params[name]))
+               for name in endpoint['filters'] if name in params]
+
+    key = endpoint['key']
+    after = decode_cursor(params['after'], endpoint['key_names']) if 'after' in params else None
+    keyset_clause = f"({', '.join(key)}) > ({', '.join('?' for _ in key)})"
+
+    where = [endpoint['filters'][name] for name, _ in filters]
+    bind = [value for _, value in filters]
+    if after is not None:
+        where.append(keyset_clause)
+        bind += after
+    sql = endpoint['sql'] + (f" WHERE {' AND '.join(where)}" if where else '')
+
+    sql += f" ORDER BY {', '.join(key)} LIMIT ?"
+    return sql, bind + [limit], limit
+
+def database_generation(db_path=DB_PATH):
+    """
+    Returns a token that changes whenever the database is written to. It
+    combines the SQLite file change counter (bytes 24-27 of the header) with
+    the size and modification time of the database and its WAL file.
+    """
+    parts = []
+    with open(db_path, 'rb') as f:
+        header = f.read(28)
+    parts.append(str(int.from_bytes(header[24:28], 'big')) if len(header) == 28 else '0')
+    for path in (db_path, db_path + '-wal'):
+        if os.path.exists(path):
+            st = os.stat(path)
+            parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+    return '-'.join(parts)
+
+class QueryService:
+    """
+    Runs endpoint queries over a pool of read-only SQLite connections, so
+    connections (and their page caches) outlive individual HTTP connections.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = os.path.abspath(db_path)
+        self._pool = queue.SimpleQueue()
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def generation(self):
+        return database_generation(self.db_path)
+
+    def meta(self):
+        """Lists the endpoints and the values their filters accept."""
+        with self.connection() as conn:
+            return {
+                'generation': self.generation(),
+                'endpoints': {name: sorted(endpoint['filters']) + ['after', 'limit', 'format']
+                              for name, endpoint in ENDPOINTS.items()},
+                'years': [row[0] for row in conn.execute("SELECT DISTINCT year FROM elections ORDER BY year")],
+                'offices': [row[0] for row in conn.execute("SELECT office_code FROM offices ORDER BY office_code")],
+                'counties': {code: name for code, name in conn.execute(
+                    "SELECT county_code, name FROM counties ORDER BY county_code")},
+            }
+
+    def page(self, endpoint_name, params):
+        """
+        Runs one page of an endpoint query.
+        Returns (columns, rows, next_cursor); next_cursor is None on the last page.
+        """
+        sql, bind, limit = build_query(endpoint_name, params)
+        with self.connection() as conn:
+            cursor = conn.execute(sql, bind)
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+
+        next_cursor = None
+        if len(rows) == limit:
+            positions = [columns.index(name) for name in ENDPOINTS[endpoint_name]['key_names']]
+            next_cursor = encode_cursor([rows[-1][i] for i in positions])
+        return columns, rows, next_cursor
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ElectionQueryService/1.0'
+    # Chunks are written as they are encoded; without TCP_NODELAY small
+    # trailing chunks wait on the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.strip('/')
+        try:
+            params = {k: v[-1] for k, v in parse_qs(url.query, strict_parsing=False).items()}
+        except ValueError:
+            return self.send_json(400, {'error': 'Malformed query string'})
+
+        if path not in ENDPOINTS and path != '':
+            return self.send_json(404, {'error': f"Unknown endpoint '/{path}'",
+                                        'endpoints': ['/'] + [f'/{name}' for name in ENDPOINTS]})
+
+        service = self.server.service
+        try:
+            generation = service.generation()
+        except OSError as e:
+            return self.send_json(503, {'error': f"Database unavailable: {e}"})
+
+        # Responses are a pure function of the database generation and the
+        # request, so the ETag can be checked before running any query.
+        etag = '"' + hashlib.sha1(f"{generation}|{path}|{sorted(params.items())}".encode()).hexdigest()[:20] + '"'
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'public, no-cache')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        try:
+            if path == '':
+                return self.send_json(200, service.meta(), etag=etag)
+            fmt = params.get('format', 'json')
+            if fmt not in ('json', 'ndjson'):
+                raise QueryError(f"Invalid format '{fmt}', expected 'json' or 'ndjson'")
+            columns, rows, next_cursor = service.page(path, params)
+        except QueryError as e:
+            return self.send_json(400, {'error': str(e)})
+        except sqlite3.Error as e:
+            return self.send_json(500, {'error': f"Database error: {e}"})
+
+        self.stream_rows(path, params, fmt, columns, rows, next_cursor, etag)
+
+    def send_json(self, status, payload, etag=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'public, no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def write_chunk(self, data):
+        if data:
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+
+    def stream_rows(self, path, params, fmt, columns, rows, next_cursor, etag):
+        """Writes a page of rows using chunked transfer encoding."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson' if fmt == 'ndjson' else 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'public, no-cache')
+        self.send_header('X-Row-Count', str(len(rows)))
+        if next_cursor:
+            query = urlencode(dict(params, after=next_cursor))
+            self.send_header('Link', f'</{path}?{query}>; rel="next"')
+            self.send_header('X-Next-Cursor', next_cursor)
+        self.end_headers()
+
+        encoder = json.JSONEncoder(separators=(',', ':'))
+        if fmt == 'json':
+            self.write_chunk(b'{"data":[')
+        for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+            chunk = rows[start:start + STREAM_CHUNK_ROWS]
+            encoded = [encoder.encode(dict(zip(columns, row))) for row in chunk]
+            if fmt == 'ndjson':
+                self.write_chunk(''.join(line + '\n' for line in encoded).encode())
+            else:
+                self.write_chunk(((',' if start else '') + ','.join(encoded)).encode())
+        if fmt == 'json':
+            self.write_chunk(f'],"next":{json.dumps(next_cursor)}}}'.encode())
+        self.wfile.write(b"0\r\n\r\n")
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, db_path=DB_PATH, quiet=False):
+    """Creates (but does not start) a threaded query server."""
+    server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    server.daemon_threads = True
+    server.service = QueryService(db_path)
+    server.quiet = quiet
+    return server
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Read-only JSON query service over the election database.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--db', default=DB_PATH, help='Path to election_data.db')
+    parser.add_argument('--quiet', action='store_true', help='Do not log each request')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database file not found at {args.db}")
+    else:
+        server = make_server(args.host, args.port, args.db, args.quiet)
+        print(f"Serving {os.path.abspath(args.db)} on http://{args.host}:{args.port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
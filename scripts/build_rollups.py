@@ -0,0 +1,64 @@
+import sqlite3
+import os
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'election_data.db')
+
+# Votes and registered voters per year, office, county and party. The primary
+# key is the query service's keyset, so each /rollups page is a range scan of
+# this table instead of a re-aggregation of the fact tables.
+ROLLUPS_DDL = """
+CREATE TABLE IF NOT EXISTS rollups (
+    year INTEGER NOT NULL,
+    office_code TEXT NOT NULL,
+    county_code TEXT NOT NULL,
+    county_name TEXT,
+    party_code TEXT NOT NULL,
+    votes INTEGER NOT NULL,
+    registered_voters INTEGER,
+    PRIMARY KEY (year, office_code, county_code, party_code)
+) WITHOUT ROWID
+"""
+
+REBUILD_ROLLUPS_QUERY = """
+INSERT INTO rollups (year, office_code, county_code, county_name, party_code, votes, registered_voters)
+WITH votes AS (
+    SELECT r.election_id, r.office_id, p.county_id, r.party_id, SUM(r.vote_total) AS votes
+    FROM results r
+    JOIN precincts p ON r.precinct_id = p.id
+    GROUP BY r.election_id, r.office_id, p.county_id, r.party_id
+), registered AS (
+    SELECT reg.election_id, p.county_id, reg.party_id, SUM(reg.registered_voters) AS registered_voters
+    FROM registration reg
+    JOIN precincts p ON reg.precinct_id = p.id
+    GROUP BY reg.election_id, p.county_id, reg.party_id
+)
+SELECT e.year, off.office_code, co.county_code, co.name, pa.party_code, v.votes, rg.registered_voters
+FROM votes v
+JOIN elections e ON v.election_id = e.id
+JOIN offices off ON v.office_id = off.id
+JOIN counties co ON v.county_id = co.id
+JOIN parties pa ON v.party_id = pa.id
+LEFT JOIN registered rg ON rg.election_id = v.election_id
+                       AND rg.county_id = v.county_id
+                       AND rg.party_id = v.party_id
+"""
+
+def create_rollups_table(cursor):
+    """Creates the rollups table if it does not exist."""
+    cursor.execute(ROLLUPS_DDL)
+
+def rebuild_rollups(cursor):
+    """
+    Repopulates the rollups table from results and registration. Called at
+    the end of each ingest so the table stays in step with the warehouse.
+    """
+    create_rollups_table(cursor)
+    cursor.execute("DELETE FROM rollups")
+    cursor.execute(REBUILD_ROLLUPS_QUERY)
+    cursor.execute("SELECT COUNT(*) FROM rollups")
+    print(f"Rollups rebuilt: {cursor.fetchone()[0]} rows.")
+
+if __name__ == '__main__':
+    with sqlite3.connect(DB_PATH) as conn:
+        rebuild_rollups(conn.cursor())
+        conn.commit()
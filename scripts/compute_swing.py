@@ -0,0 +1,222 @@
+import sqlite3
+import os
+import time
+import numpy as np
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'election_data.db')
+
+# Precomputed swing between every pair of election years. Shares are
+# two-party DEM shares, DEM / (DEM + REP), so a positive change is a swing
+# toward the Democratic candidate (or registration) and a negative change a
+# swing toward the Republican one. Turnout is total votes cast for the office
+# divided by total registered voters in the precinct (statewide: summed over
+# the precincts that have both).
+SWING_TABLES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS swing (
+        year_from INTEGER NOT NULL,
+        year_to INTEGER NOT NULL,
+        precinct_id INTEGER NOT NULL,
+        office_id INTEGER NOT NULL,
+        vote_share_from REAL,
+        vote_share_to REAL,
+        vote_share_change REAL,
+        registration_share_change REAL,
+        turnout_change REAL,
+        votes_change INTEGER,
+        FOREIGN KEY (precinct_id) REFERENCES precincts (id),
+        FOREIGN KEY (office_id) REFERENCES offices (id),
+        PRIMARY KEY (year_from, year_to, office_id, precinct_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS statewide_swing (
+        year_from INTEGER NOT NULL,
+        year_to INTEGER NOT NULL,
+        office_id INTEGER NOT NULL,
+        vote_share_from REAL,
+        vote_share_to REAL,
+        vote_share_change REAL,
+        registration_share_change REAL,
+        turnout_change REAL,
+        votes_change INTEGER,
+        FOREIGN KEY (office_id) REFERENCES offices (id),
+        PRIMARY KEY (year_from, year_to, office_id)
+    )
+    """,
+]
+
+# Columns of the vote and registration arrays
+DEM, REP, TOTAL = 0, 1, 2
+
+def create_swing_tables(cursor):
+    """Creates the swing tables if they do not exist."""
+    for ddl in SWING_TABLES_DDL:
+        cursor.execute(ddl)
+
+def load_totals(cursor):
+    """
+    Loads DEM, REP and total votes per (year, precinct, office) and
+    registered voters per (year, precinct), aggregated in SQL.
+    Returns two int64 arrays: votes rows are (year, precinct_id, office_id,
+    dem, rep, total) and registration rows are (year, precinct_id, dem, rep, total).
+    """
+    cursor.execute("""
+    SELECT e.year, r.precinct_id, r.office_id,
+           SUM(CASE WHEN pa.party_code = 'DEM' THEN r.vote_total ELSE 0 END),
+           SUM(CASE WHEN pa.party_code = 'REP' THEN r.vote_total ELSE 0 END),
+           SUM(r.vote_total)
+    FROM results r
+    JOIN elections e ON r.election_id = e.id
+    JOIN parties pa ON r.party_id = pa.id
+    GROUP BY e.year, r.precinct_id, r.office_id
+    """)
+    votes = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 6)
+
+    cursor.execute("""
+    SELECT e.year, reg.precinct_id,
+           SUM(CASE WHEN pa.party_code = 'DEM' THEN reg.registered_voters ELSE 0 END),
+           SUM(CASE WHEN pa.party_code = 'REP' THEN reg.registered_voters ELSE 0 END),
+           SUM(reg.registered_voters)
+    FROM registration reg
+    JOIN elections e ON reg.election_id = e.id
+    JOIN parties pa ON reg.party_id = pa.id
+    GROUP BY e.year, reg.precinct_id
+    """)
+    registration = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 5)
+    return votes, registration
+
+def two_party_share(values):
+    """DEM / (DEM + REP) along the last axis; NaN where there are no major-party counts."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return values[..., DEM] / (values[..., DEM] + values[..., REP])
+
+def compute_swing(votes, registration):
+    """
+    Computes swing for every precinct, office and pair of years.
+
+    The long-format totals are scattered into dense arrays indexed by
+    (year, precinct, office), with NaN where a precinct has no data for a
+    year, so every year pair is computed at once by indexing the year axis
+    with the pair indices. Precincts missing in either year of a pair come
+    out as NaN and are dropped.
+
+    Returns (precinct_rows, statewide_rows) as dicts of equal-length arrays.
+    """
+    years = np.unique(np.concatenate([votes[:, 0], registration[:, 0]]))
+    precincts = np.unique(np.concatenate([votes[:, 1], registration[:, 1]]))
+    offices = np.unique(votes[:, 2])
+
+    vote_cube = np.full((len(years), len(precincts), len(offices), 3), np.nan)
+    vote_cube[np.searchsorted(years, votes[:, 0]),
+              np.searchsorted(precincts, votes[:, 1]),
+              np.searchsorted(offices, votes[:, 2])] = votes[:, 3:]
+
+    reg_cube = np.full((len(years), len(precincts), 3), np.nan)
+    reg_cube[np.searchsorted(years, registration[:, 0]),
+             np.searchsorted(precincts, registration[:, 1])] = registration[:, 2:]
+
+    year_from, year_to = np.triu_indices(len(years), k=1)
+
+    # Per-precinct metrics, shaped (year, precinct, office)
+    vote_share = two_party_share(vote_cube)
+    reg_share = two_party_share(reg_cube)[:, :, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        turnout = vote_cube[..., TOTAL] / reg_cube[:, :, None, TOTAL]
+    turnout[~np.isfinite(turnout)] = np.nan
+
+    # Pairwise deltas, shaped (pair, precinct, office)
+    share_from, share_to = vote_share[year_from], vote_share[year_to]
+    reg_change = np.broadcast_to(reg_share[year_to] - reg_share[year_from], share_to.shape)
+    turnout_change = turnout[year_to] - turnout[year_from]
+    votes_change = vote_cube[year_to, ..., TOTAL] - vote_cube[year_from, ..., TOTAL]
+
+    pair, p, o = np.nonzero(~np.isnan(votes_change))
+    precinct_rows = {
+        'year_from': years[year_from[pair]],
+        'year_to': years[year_to[pair]],
+        'precinct_id': precincts[p],
+        'office_id': offices[o],
+        'vote_share_from': share_from[pair, p, o],
+        'vote_share_to': share_to[pair, p, o],
+        'vote_share_change': share_to[pair, p, o] - share_from[pair, p, o],
+        'registration_share_change': reg_change[pair, p, o],
+        'turnout_change': turnout_change[pair, p, o],
+        'votes_change': votes_change[pair, p, o].astype(np.int64),
+    }
+
+    # Statewide vote totals per pair only sum the precincts with results for
+    # the office in both years, so district offices (e.g. STS) compare the
+    # same districts rather than whichever ones were up in each year.
+    # Shaped (pair, office, 3) after summing over the precinct axis.
+    both = ~np.isnan(vote_cube[year_from, ..., TOTAL]) & ~np.isnan(vote_cube[year_to, ..., TOTAL])
+    state_from = np.nansum(np.where(both[..., None], vote_cube[year_from], np.nan), axis=1)
+    state_to = np.nansum(np.where(both[..., None], vote_cube[year_to], np.nan), axis=1)
+    state_share_from, state_share_to = two_party_share(state_from), two_party_share(state_to)
+
+    state_reg = np.nansum(reg_cube, axis=1)
+    state_reg_share = two_party_share(state_reg)[:, None]
+
+    # Turnout only counts precincts with both votes for the office and
+    # registration, so district offices are measured against the voters who
+    # could vote in that race rather than the whole state. Shaped (year, office).
+    reg_by_office = np.broadcast_to(reg_cube[:, :, None, TOTAL], vote_cube.shape[:-1])
+    covered = ~np.isnan(vote_cube[..., TOTAL]) & ~np.isnan(reg_by_office)
+    covered_votes = np.nansum(np.where(covered, vote_cube[..., TOTAL], np.nan), axis=1)
+    covered_reg = np.nansum(np.where(covered, reg_by_office, np.nan), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        state_turnout = covered_votes / covered_reg
+    state_turnout[~np.isfinite(state_turnout)] = np.nan
+
+    pair, o = np.nonzero(both.any(axis=1))
+    statewide_rows = {
+        'year_from': years[year_from[pair]],
+        'year_to': years[year_to[pair]],
+        'office_id': offices[o],
+        'vote_share_from': state_share_from[pair, o],
+        'vote_share_to': state_share_to[pair, o],
+        'vote_share_change': state_share_to[pair, o] - state_share_from[pair, o],
+        'registration_share_change': (state_reg_share[year_to] - state_reg_share[year_from])[pair, 0],
+        'turnout_change': state_turnout[year_to[pair], o] - state_turnout[year_from[pair], o],
+        'votes_change': (state_to[pair, o, TOTAL] - state_from[pair, o, TOTAL]).astype(np.int64),
+    }
+    return precinct_rows, statewide_rows
+
+def write_rows(cursor, table_name, rows):
+    """Replaces the contents of a swing table with the given column arrays."""
+    columns = list(rows)
+    # NaN is bound as NULL by SQLite; numpy scalars are converted via tolist()
+    values = zip(*(rows[c].tolist() for c in columns))
+    cursor.execute(f"DELETE FROM {table_name}")
+    cursor.executemany(
+        f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        values)
+
+def compute_all_swing():
+    """Computes precinct and statewide swing for all offices and year pairs."""
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.cursor()
+        create_swing_tables(cursor)
+
+        start = time.perf_counter()
+        votes, registration = load_totals(cursor)
+        loaded = time.perf_counter()
+        if len(votes) == 0:
+            print("No election results found; swing tables not updated.")
+            return
+
+        precinct_rows, statewide_rows = compute_swing(votes, registration)
+        computed = time.perf_counter()
+
+        write_rows(cursor, 'swing', precinct_rows)
+        write_rows(cursor, 'statewide_swing', statewide_rows)
+        conn.commit()
+        written = time.perf_counter()
+
+        print(f"Loaded totals in {loaded - start:.2f}s, computed swing in {computed - loaded:.2f}s, "
+              f"wrote tables in {written - computed:.2f}s.")
+        print(f"Stored {len(precinct_rows['year_from'])} precinct swing rows and "
+              f"{len(statewide_rows['year_from'])} statewide swing rows.")
+
+if __name__ == '__main__':
+    compute_all_swing()
@@ -1,6 +1,10 @@
 import sqlite3
 import os
 
+from search_index import create_search_index
+from compute_swing import create_swing_tables
+from build_rollups import create_rollups_table
+
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'election_data.db')
 
 def create_database():
@@ -12,6 +16,10 @@ def create_database():
         cursor = conn.cursor()
 
         # Drop tables if they exist to ensure a clean slate
+        cursor.execute("DROP TABLE IF EXISTS statewide_swing")
+        cursor.execute("DROP TABLE IF EXISTS swing")
+        cursor.execute("DROP TABLE IF EXISTS search_index")
+        cursor.execute("DROP TABLE IF EXISTS rollups")
         cursor.execute("DROP TABLE IF EXISTS registration")
         cursor.execute("DROP TABLE IF EXISTS results")
         cursor.execute("DROP TABLE IF EXISTS offices")
@@ -135,6 +143,21 @@ def create_database():
         )
         """)
 
+        # Secondary indexes for filtering the fact tables by election, office
+        # and precinct; rowid order within each key keeps keyset pagination cheap
+        cursor.execute("CREATE INDEX idx_results_election_office ON results (election_id, office_id)")
+        cursor.execute("CREATE INDEX idx_results_precinct ON results (precinct_id)")
+        cursor.execute("CREATE INDEX idx_registration_precinct ON registration (precinct_id)")
+
+        # Create the full-text search index over candidates, precincts and offices
+        create_search_index(cursor)
+
+        # Create the precomputed cross-cycle swing tables
+        create_swing_tables(cursor)
+
+        # Create the rollups table served by the query service
+        create_rollups_table(cursor)
+
         print(f"Database created successfully at {DB_PATH}")
 
 if __name__ == '__main__':
@@ -6,6 +6,9 @@ DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'election_da
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 
 from ingest_registration import get_or_create, COUNTY_MAP
+from search_index import rebuild_search_index
+from build_rollups import rebuild_rollups
+from layouts import get_parser, LayoutError
 
 # Mapping for office codes to full names
 OFFICE_CODE_MAP = {
@@ -41,47 +44,57 @@ def process_election_file(cursor, file_path, year):
     print(f"Processing election file: {file_path}...")
     state_id = get_or_create(cursor, 'states', {'abbreviation': 'PA'}, {'name': 'Pennsylvania'})
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+    # The column layout comes from data/ElectionReturns_Data.txt
+    parser = get_parser('election', year)
+
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        try:
+            parser.check_header(next(reader, []))
+        except LayoutError as e:
+            print(f"ERROR: {file_path} does not match its layout, skipping it. {e}")
+            return
+
         count = 0
-        for row in reader:
+        for raw_row in reader:
             try:
-                if not row.get('candidate_number', '').strip():
+                row = parser.parse(raw_row)
+                if not row.candidate_number:
                     continue
 
                 election_id = get_or_create(cursor, 'elections',
                                             {'state_id': state_id, 'year': int(year), 'type': 'G'})
 
-                county_code_str = row['county_code'].zfill(2)
+                county_code_str = row.county_code
                 county_name = COUNTY_MAP.get(county_code_str, f"Unknown County {county_code_str}")
                 county_id = get_or_create(cursor, 'counties',
                                           {'state_id': state_id, 'county_code': county_code_str},
                                           {'name': county_name})
 
                 precinct_id = get_or_create(cursor, 'precincts',
-                                            {'county_id': county_id, 'precinct_code': row['precinct_code'].strip()})
+                                            {'county_id': county_id, 'precinct_code': row.precinct_code})
 
                 candidate_id = get_or_create(cursor, 'candidates',
-                                             {'candidate_number': row['candidate_number'].strip()},
-                                             {'first_name': row['candidate_first_name'].strip(), 'last_name': row['candidate_last_name'].strip()})
+                                             {'candidate_number': row.candidate_number},
+                                             {'first_name': row.candidate_first_name, 'last_name': row.candidate_last_name})
 
-                party_id = get_or_create(cursor, 'parties', {'party_code': row['candidate_party_code'].strip()})
+                party_id = get_or_create(cursor, 'parties', {'party_code': row.candidate_party_code})
 
-                office_code = row['candidate_office_code'].strip()
+                office_code = row.candidate_office_code
                 office_name = OFFICE_CODE_MAP.get(office_code, office_code) # Use mapping, fallback to code
                 
                 office_id = get_or_create(cursor, 'offices',
                                            {'office_code': office_code},
-                                           {'name': office_name, 'district': int(row['candidate_district']) if row['candidate_district'].isdigit() else None})
+                                           {'name': office_name, 'district': int(row.candidate_district) if row.candidate_district.isdigit() else None})
 
                 cursor.execute("""
                 INSERT OR IGNORE INTO results (election_id, precinct_id, candidate_id, party_id, office_id, vote_total)
                 VALUES (?, ?, ?, ?, ?, ?)
-                """, (election_id, precinct_id, candidate_id, party_id, office_id, int(row['vote_total'])))
+                """, (election_id, precinct_id, candidate_id, party_id, office_id, row.vote_total))
                 
                 count += 1
             except Exception as e:
-                print(f"Error processing row in {year}: {row}")
+                print(f"Error processing row in {year}: {raw_row}")
                 print(f"Error: {e}")
         
         print(f"Successfully ingested {count} election result records for {year}.")
@@ -105,6 +118,8 @@ def ingest_all_election_data():
             else:
                 print(f"No election results file found for {year}")
         
+        rebuild_search_index(cursor)
+        rebuild_rollups(cursor)
         conn.commit()
 
 if __name__ == '__main__':
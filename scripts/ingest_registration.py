@@ -3,6 +3,10 @@ import csv
 import os
 import pandas as pd
 
+from search_index import rebuild_search_index
+from build_rollups import rebuild_rollups
+from layouts import get_parser, LayoutError
+
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'election_data.db')
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 
@@ -70,38 +74,34 @@ def process_registration_file(cursor, file_path, year):
     """Processes a single registration file, either txt or xlsx."""
     print(f"Processing registration file: {file_path}...")
     state_id = get_or_create(cursor, 'states', {'abbreviation': 'PA'}, {'name': 'Pennsylvania'})
-    
-    fieldnames = [
-        'election_year', 'election_type', 'county_code', 'precinct_code',
-        'party_1_rank', 'party_1_abbr', 'party_1_voters', 'party_2_rank', 'party_2_abbr', 'party_2_voters',
-        'party_3_rank', 'party_3_abbr', 'party_3_voters', 'party_4_rank', 'party_4_abbr', 'party_4_voters',
-        'party_5_rank', 'party_5_abbr', 'party_5_voters', 'party_6_rank', 'party_6_abbr', 'party_6_voters',
-        'us_congressional_district', 'state_senatorial_district', 'state_house_district',
-        'municipality_type_code', 'municipality_name', 'municipality_breakdown_code_1',
-        'municipality_breakdown_name_1', 'municipality_breakdown_code_2', 'municipality_breakdown_name_2',
-        'bi_county_code', 'm_c_d_code', 'f_i_p_s_code', 'v_t_d_code',
-        'previous_precinct_code', 'previous_us_congressional_district',
-        'previous_state_senatorial_district', 'previous_state_house_district'
-    ]
+
+    # The column layout comes from data/VoterRegistration_Data.txt
+    parser = get_parser('registration', year)
+    party_columns = [(parser.index[f'party_{i}_abbr'], parser.index[f'party_{i}_voters']) for i in range(1, 7)]
 
     rows = []
     if file_path.endswith('.txt'):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            rows = list(csv.DictReader(f, fieldnames=fieldnames))
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
     elif file_path.endswith('.xlsx'):
-        df = pd.read_excel(file_path, header=None)
-        # Trim the dataframe to the expected number of columns before assigning names
-        df = df.iloc[:, :len(fieldnames)]
-        df.columns = fieldnames
-        rows = df.to_dict('records')
+        df = pd.read_excel(file_path, header=None, dtype=str).fillna('')
+        # Trim the dataframe to the expected number of columns
+        df = df.iloc[:, :parser.width]
+        rows = list(df.itertuples(index=False, name=None))
+
+    if rows:
+        try:
+            parser.check_width(rows[0])
+        except LayoutError as e:
+            print(f"ERROR: {file_path} does not match its layout, skipping it. {e}")
+            return
 
     count = 0
-    for row in rows:
+    for raw_row in rows:
         try:
-            # Standardize data types
-            row = {k: str(v).strip() if v is not None else '' for k, v in row.items()}
+            row = parser.parse(raw_row)
 
-            county_code_str = row['county_code'].zfill(2)
+            county_code_str = row.county_code
             county_name = COUNTY_MAP.get(county_code_str, f"Unknown County {county_code_str}")
 
             election_id = get_or_create(cursor, 'elections',
@@ -109,28 +109,18 @@ def process_registration_file(cursor, file_path, year):
 
             county_id = get_or_create(cursor, 'counties',
                                       {'state_id': state_id, 'county_code': county_code_str},
-                                      {'name': county_name, 'fips_code': row.get('f_i_p_s_code', '')})
+                                      {'name': county_name, 'fips_code': row.f_i_p_s_code})
 
             precinct_id = get_or_create(cursor, 'precincts',
-                                        {'county_id': county_id, 'precinct_code': row['precinct_code'].strip()},
-                                        {'municipality_name': row.get('municipality_name', ''),
-                                         'us_congressional_district': row.get('us_congressional_district', ''),
-                                         'state_senatorial_district': row.get('state_senatorial_district', ''),
-                                         'state_house_district': row.get('state_house_district', '')})
-
-            for i in range(1, 7):
-                party_abbr = row.get(f'party_{i}_abbr', '')
-                voters_str = row.get(f'party_{i}_voters', '0')
-                
-                if pd.isna(voters_str) or voters_str == 'nan':
-                    voters_str = '0'
-                
-                voters_count = 0
-                try:
-                    voters_count = int(float(voters_str))
-                except (ValueError, TypeError):
-                    print(f"WARNING: Could not convert '{voters_str}' to number for party '{party_abbr}' in row. Setting to 0.")
-                    voters_count = 0
+                                        {'county_id': county_id, 'precinct_code': row.precinct_code},
+                                        {'municipality_name': row.municipality_name,
+                                         'us_congressional_district': row.u_s_congressional_district,
+                                         'state_senatorial_district': row.state_senatorial_district,
+                                         'state_house_district': row.state_house_district})
+
+            for abbr_index, voters_index in party_columns:
+                party_abbr = row[abbr_index]
+                voters_count = row[voters_index]
 
                 if party_abbr and voters_count > 0:
                     party_id = get_or_create(cursor, 'parties', {'party_code': party_abbr})
@@ -146,7 +136,7 @@ def process_registration_file(cursor, file_path, year):
             
             count += 1
         except Exception as e:
-            print(f"Error processing row in {year}: {row}")
+            print(f"Error processing row in {year}: {raw_row}")
             print(f"Error: {e}")
     
     print(f"Successfully processed {count} records for {year}.")
@@ -173,6 +163,8 @@ def ingest_all_registration_data():
             else:
                 print(f"No registration file found for {year}")
         
+        rebuild_search_index(cursor)
+        rebuild_rollups(cursor)
         conn.commit()
 
         # Verification step
@@ -0,0 +1,208 @@
+import os
+import re
+import sys
+import marshal
+import hashlib
+import tempfile
+from collections import namedtuple
+from functools import lru_cache
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+# Generated parsers are cached as marshalled code objects, keyed by the
+# generated source, so they are regenerated whenever a layout or the rules
+# that derive fields from it (names, int and padded fields) change.
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '__pycache__', 'layouts')
+
+# Bump when the generated code changes so stale cache entries are ignored
+GENERATOR_VERSION = 1
+
+# Layout definition files shipped by the Department of State, per file
+# format. A year-specific layout is used when present, otherwise the shared
+# one (the layouts have not changed across the years we ingest).
+LAYOUT_FILES = {
+    'registration': ('VoterRegistration_{year}_Data.txt', 'VoterRegistration_Data.txt'),
+    'election': ('ElectionReturns_{year}_Data.txt', 'ElectionReturns_Data.txt'),
+}
+
+# One field per line: description, maximum length and data type, e.g.
+# "County Code *			2       		Numeric"
+LAYOUT_LINE = re.compile(r'^\s*(?P<description>\S.*?)\s+(?P<length>\d+)\s+(?P<data_type>Numeric|Character)\s*$')
+
+# Field names are derived from the layout descriptions; these rules map the
+# derived names onto the column names the ingest scripts have always used.
+FIELD_NAME_RULES = [
+    (r'^registered_voters_for_party_(\d)$', r'party_\1_voters'),
+    (r'^party_(\d)_abbreviation$', r'party_\1_abbr'),
+    (r'^election_type_code$', 'election_type'),
+    (r'^(previous_)?(pennsylvania|pa)_state_', r'\1state_'),
+    (r'^mcd_code$', 'm_c_d_code'),
+    (r'^fips_code$', 'f_i_p_s_code'),
+    (r'^vtd_code$', 'v_t_d_code'),
+    (r'^ballotquestion$', 'ballot_question'),
+    (r'^recordtype$', 'record_type'),
+]
+
+# Numeric fields converted to int. Other numeric fields are codes or
+# district numbers and are kept as text, as they are stored in TEXT columns.
+INT_FIELDS = re.compile(r'^(election_year|.*_rank|.*_voters|.*_total|candidate_ballot_position)$')
+
+# Code fields zero-padded to their layout length (e.g. county "1" -> "01")
+PADDED_FIELDS = {'county_code', 'f_i_p_s_code', 'm_c_d_code', 'v_t_d_code'}
+
+Field = namedtuple('Field', ['name', 'description', 'length', 'data_type', 'kind'])
+
+class LayoutError(ValueError):
+    """Raised when a layout cannot be read or a file does not match its layout."""
+
+def field_name(description):
+    """Derives a snake_case field name from a layout field description."""
+    name = re.sub(r'\(.*?\)', '', description).replace('*', '')
+    name = re.sub(r'[^0-9a-z]+', '_', name.lower()).strip('_')
+    for pattern, replacement in FIELD_NAME_RULES:
+        name = re.sub(pattern, replacement, name)
+    return name
+
+def header_key(name):
+    """Normalizes a column name for comparison ("previous_u._s._..." == "previous_u_s_...")."""
+    return re.sub(r'[^0-9a-z]', '', name.lower())
+
+def layout_path(file_format, year):
+    """Returns the layout file for a format and year."""
+    if file_format not in LAYOUT_FILES:
+        raise LayoutError(f"Unknown file format '{file_format}'")
+    year_specific, shared = LAYOUT_FILES[file_format]
+    path = os.path.join(DATA_DIR, year_specific.format(year=year))
+    return path if os.path.exists(path) else os.path.join(DATA_DIR, shared)
+
+def parse_layout(text):
+    """Parses the field table of a layout file into a tuple of Fields."""
+    fields = []
+    for line in text.splitlines():
+        match = LAYOUT_LINE.match(line)
+        if not match:
+            continue
+        name = field_name(match['description'])
+        if match['data_type'] == 'Numeric' and INT_FIELDS.match(name):
+            kind = 'int'
+        elif name in PADDED_FIELDS:
+            kind = 'padded'
+        else:
+            kind = 'text'
+        fields.append(Field(name, match['description'].strip(), int(match['length']), match['data_type'], kind))
+
+    if not fields:
+        raise LayoutError("No field definitions found in layout")
+    names = [f.name for f in fields]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise LayoutError(f"Duplicate field names in layout: {', '.join(duplicates)}")
+    return tuple(fields)
+
+def to_int(value):
+    """Converts a numeric field; empty cells are 0, "12.0" (from Excel) is 12."""
+    try:
+        return int(value)
+    except ValueError:
+        value = value.strip()
+        if not value or value == 'nan':
+            return 0
+        return int(float(value))
+
+def generate_source(fields):
+    """
+    Generates the source of a parse(row) function for a layout. The function
+    converts a row (a sequence of strings) to a Record in a single expression,
+    with each field's conversion inlined.
+    """
+    conversions = {
+        'int': "to_int(row[{i}])",
+        'padded': "row[{i}].strip().zfill({length})",
+        'text': "row[{i}].strip()",
+    }
+    lines = [
+        "def parse(row):",
+        f"    if len(row) != {len(fields)}:",
+        f"        raise LayoutError(f'expected {len(fields)} fields, got {{len(row)}}')",
+        "    return Record(",
+    ]
+    for i, field in enumerate(fields):
+        lines.append(f"        {conversions[field.kind].format(i=i, length=field.length)},  # {field.name}")
+    lines.append("    )")
+    return '\n'.join(lines) + '\n'
+
+class RecordParser:
+    """A generated parser for one file format and year."""
+
+    def __init__(self, file_format, year, fields, parse):
+        self.file_format = file_format
+        self.year = year
+        self.fields = fields
+        self.names = tuple(f.name for f in fields)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.width = len(fields)
+        self.parse = parse
+
+    def check_header(self, header):
+        """Raises LayoutError if a file's header row does not match the layout."""
+        if [header_key(h) for h in header] != [header_key(n) for n in self.names]:
+            expected = set(map(header_key, self.names))
+            actual = set(map(header_key, header))
+            raise LayoutError(
+                f"{self.file_format} {self.year} header does not match layout: "
+                f"{len(header)} columns vs {self.width} expected; "
+                f"missing {sorted(expected - actual) or 'none'}, unexpected {sorted(actual - expected) or 'none'}")
+
+    def check_width(self, row):
+        """Raises LayoutError if a row does not have the layout's number of columns."""
+        if len(row) != self.width:
+            raise LayoutError(
+                f"{self.file_format} {self.year} rows have {len(row)} columns, layout defines {self.width}")
+
+def load_code(file_format, year, fields):
+    """Returns the compiled parse() code, from the cache when possible."""
+    source = generate_source(fields)
+    key = hashlib.sha1(f"{GENERATOR_VERSION}|{file_format}|{year}|{source}".encode()).hexdigest()[:16]
+    cache_path = os.path.join(CACHE_DIR, f"{file_format}_{year}_{key}.{sys.implementation.cache_tag}.bin")
+
+    try:
+        with open(cache_path, 'rb') as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    code = compile(source, f"<{file_format} {year} layout parser>", 'exec')
+    # Written to a temporary file and renamed into place, so a concurrent
+    # ingest never reads a partially written entry
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(code, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass  # The cache is an optimization only
+    return code
+
+@lru_cache(maxsize=None)
+def get_parser(file_format, year):
+    """
+    Returns the RecordParser for a file format ('registration' or 'election')
+    and year, reading its layout file and generating the parser on first use.
+    """
+    path = layout_path(file_format, year)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            layout_text = f.read()
+    except OSError as e:
+        raise LayoutError(f"Cannot read layout file {path}: {e}")
+
+    fields = parse_layout(layout_text)
+    record_type = namedtuple(f"{file_format.capitalize()}Record", [f.name for f in fields])
+    namespace = {'Record': record_type, 'to_int': to_int, 'LayoutError': LayoutError}
+    exec(load_code(file_format, year, fields), namespace)
+    return RecordParser(file_format, year, fields, namespace['parse'])
@@ -0,0 +1,210 @@
+import sqlite3
+import os
+import re
+import unicodedata
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'election_data.db')
+
+# The trigram tokenizer matches any substring of 3+ characters, which gives
+# both prefix (typeahead) and infix matching from a single index. Text is
+# normalized with normalize_name() before it is indexed or queried.
+SEARCH_INDEX_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    kind UNINDEXED,
+    entity_id UNINDEXED,
+    name_key,
+    label UNINDEXED,
+    detail UNINDEXED,
+    years UNINDEXED,
+    tokenize = 'trigram'
+)
+"""
+
+SEARCH_KINDS = ('candidate', 'precinct', 'office')
+
+# Each kind is indexed with a single INSERT ... SELECT over the warehouse.
+# Years are collected from the fact tables so a candidate or precinct can be
+# found across every election cycle it appears in.
+REBUILD_QUERIES = {
+    'candidate': """
+    INSERT INTO search_index (kind, entity_id, name_key, label, detail, years)
+    SELECT 'candidate', ca.id,
+           normalize_name(TRIM(COALESCE(ca.first_name, '') || ' ' || COALESCE(ca.last_name, ''))),
+           TRIM(COALESCE(ca.first_name, '') || ' ' || COALESCE(ca.last_name, '')),
+           ca.candidate_number,
+           (SELECT GROUP_CONCAT(year, ' ') FROM (
+                SELECT DISTINCT e.year FROM candidate_elections ce
+                JOIN elections e ON ce.election_id = e.id
+                WHERE ce.candidate_id = ca.id ORDER BY e.year))
+    FROM candidates ca
+    """,
+    'precinct': """
+    INSERT INTO search_index (kind, entity_id, name_key, label, detail, years)
+    SELECT 'precinct', p.id,
+           normalize_name(COALESCE(p.municipality_name, '') || ' ' || COALESCE(co.name, '') || ' ' || p.precinct_code),
+           COALESCE(NULLIF(p.municipality_name, ''), p.precinct_code),
+           COALESCE(co.name, '') || ' ' || p.precinct_code,
+           (SELECT GROUP_CONCAT(year, ' ') FROM (
+                SELECT DISTINCT e.year FROM precinct_elections pe
+                JOIN elections e ON pe.election_id = e.id
+                WHERE pe.precinct_id = p.id ORDER BY e.year))
+    FROM precincts p
+    JOIN counties co ON p.county_id = co.id
+    """,
+    'office': """
+    INSERT INTO search_index (kind, entity_id, name_key, label, detail, years)
+    SELECT 'office', off.id,
+           normalize_name(COALESCE(off.name, '') || ' ' || off.office_code),
+           COALESCE(off.name, off.office_code),
+           off.office_code,
+           (SELECT GROUP_CONCAT(year, ' ') FROM (
+                SELECT DISTINCT e.year FROM office_elections oe
+                JOIN elections e ON oe.election_id = e.id
+                WHERE oe.office_id = off.id ORDER BY e.year))
+    FROM offices off
+    """,
+}
+
+def normalize_name(text):
+    """
+    Normalizes a name for indexing and lookup: strips accents, upper-cases,
+    replaces punctuation with spaces and collapses whitespace.
+    """
+    if text is None:
+        return ''
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r'[^0-9A-Za-z]+', ' ', text)
+    return ' '.join(text.upper().split())
+
+def register_functions(conn):
+    """Registers the SQL functions the search index relies on."""
+    conn.create_function('normalize_name', 1, normalize_name, deterministic=True)
+
+def create_search_index(cursor):
+    """Creates the FTS5 search index table if it does not exist."""
+    cursor.execute(SEARCH_INDEX_DDL)
+
+def rebuild_search_index(cursor):
+    """
+    Repopulates the search index from the candidates, precincts and offices
+    tables. Called at the end of each ingest so the index stays in step with
+    the warehouse.
+    """
+    register_functions(cursor.connection)
+    create_search_index(cursor)
+    cursor.execute("DELETE FROM search_index")
+
+    # Distinct (entity, election) pairs, built once and shared by the
+    # per-kind queries instead of rescanning the fact tables per row.
+    cursor.execute("DROP TABLE IF EXISTS temp.candidate_elections")
+    cursor.execute("DROP TABLE IF EXISTS temp.precinct_elections")
+    cursor.execute("DROP TABLE IF EXISTS temp.office_elections")
+    cursor.execute("""
+    CREATE TEMP TABLE candidate_elections AS
+    SELECT DISTINCT candidate_id, election_id FROM results
+    """)
+    cursor.execute("""
+    CREATE TEMP TABLE office_elections AS
+    SELECT DISTINCT office_id, election_id FROM results
+    """)
+    cursor.execute("""
+    CREATE TEMP TABLE precinct_elections AS
+    SELECT DISTINCT precinct_id, election_id FROM registration
+    UNION
+    SELECT DISTINCT precinct_id, election_id FROM results
+    """)
+    cursor.execute("CREATE INDEX temp.idx_candidate_elections ON candidate_elections (candidate_id)")
+    cursor.execute("CREATE INDEX temp.idx_office_elections ON office_elections (office_id)")
+    cursor.execute("CREATE INDEX temp.idx_precinct_elections ON precinct_elections (precinct_id)")
+
+    for kind in SEARCH_KINDS:
+        cursor.execute(REBUILD_QUERIES[kind])
+
+    cursor.execute("DROP TABLE temp.candidate_elections")
+    cursor.execute("DROP TABLE temp.precinct_elections")
+    cursor.execute("DROP TABLE temp.office_elections")
+    cursor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+    cursor.execute("SELECT kind, COUNT(*) FROM search_index GROUP BY kind ORDER BY kind")
+    counts = ', '.join(f"{count} {kind}s" for kind, count in cursor.fetchall())
+    print(f"Search index rebuilt: {counts or 'no entries'}.")
+
+def search(conn, query, kinds=None, year=None, limit=20):
+    """
+    Looks up candidates, precincts and offices matching `query`.
+
+    Every word of the query must appear somewhere in the entry's name, so
+    partial words work for typeahead ("harr kam" finds KAMALA HARRIS).
+    Words of 3+ characters are matched through the trigram index and ranked
+    by bm25; shorter words fall back to a LIKE filter on the matched rows.
+
+    Returns a list of dicts with kind, id, label, detail, years and score,
+    best match first.
+    """
+    terms = normalize_name(query).split()
+    if not terms:
+        return []
+
+    long_terms = [t for t in terms if len(t) >= 3]
+    short_terms = [t for t in terms if len(t) < 3]
+
+    where = []
+    params = []
+    if long_terms:
+        where.append("search_index MATCH ?")
+        params.append(' AND '.join(f'name_key : "{t}"' for t in long_terms))
+    for term in short_terms:
+        where.append("name_key LIKE ?")
+        params.append(f'%{term}%')
+    if kinds:
+        where.append(f"kind IN ({', '.join('?' for _ in kinds)})")
+        params.extend(kinds)
+    if year:
+        where.append("(' ' || years || ' ') LIKE ?")
+        params.append(f'% {int(year)} %')
+
+    score = "rank" if long_terms else "0.0"
+    order = "rank" if long_terms else "label"
+    cursor = conn.execute(f"""
+    SELECT kind, entity_id, label, detail, years, {score}
+    FROM search_index
+    WHERE {' AND '.join(where)}
+    ORDER BY {order}
+    LIMIT ?
+    """, params + [limit])
+
+    return [
+        {
+            'kind': kind,
+            'id': entity_id,
+            'label': label,
+            'detail': detail,
+            'years': [int(y) for y in years.split()] if years else [],
+            'score': score,
+        }
+        for kind, entity_id, label, detail, years, score in cursor.fetchall()
+    ]
+
+def link_candidates(conn):
+    """
+    Groups candidate ids that share a normalized name across election cycles.
+    Candidate numbers are reissued every cycle (e.g. 2024C0932), so this is
+    the link between one person's records in different years.
+
+    Returns a dict mapping the normalized name to a list of candidate ids.
+    """
+    cursor = conn.execute("""
+    SELECT name_key, GROUP_CONCAT(entity_id)
+    FROM search_index
+    WHERE kind = 'candidate' AND name_key != ''
+    GROUP BY name_key
+    HAVING COUNT(*) > 1
+    ORDER BY name_key
+    """)
+    return {name_key: [int(i) for i in ids.split(',')] for name_key, ids in cursor.fetchall()}
+
+if __name__ == '__main__':
+    with sqlite3.connect(DB_PATH) as conn:
+        rebuild_search_index(conn.cursor())
+        conn.commit()
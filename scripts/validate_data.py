@@ -0,0 +1,247 @@
+import sqlite3
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'election_data.db')
+REPORT_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'validation_report.json')
+
+from ingest_registration import COUNTY_MAP
+
+# Number of offending rows kept in the report for each failed check
+SAMPLE_SIZE = 10
+
+# A precinct's total registration changing by more than this fraction between
+# consecutive elections is flagged, provided either side has at least
+# REGISTRATION_JUMP_MIN_VOTERS voters (small precincts swing too easily).
+REGISTRATION_JUMP_THRESHOLD = 0.5
+REGISTRATION_JUMP_MIN_VOTERS = 100
+
+# Precinct codes the Department of State uses for statewide/summary rows
+PLACEHOLDER_PRECINCT_CODES = ('99999',)
+
+# The catalog of checks. Each entry is a single set-based query that returns
+# one row per violation; an empty result means the check passed. Checks with
+# severity 'error' fail the report, 'warning' checks are informational.
+CHECKS = [
+    {
+        'name': 'orphan_results',
+        'severity': 'error',
+        'description': "Rows in 'results' referencing a missing election, precinct, candidate, party or office.",
+        'sql': """
+        SELECT r.id, r.election_id, r.precinct_id, r.candidate_id, r.party_id, r.office_id
+        FROM results r
+        LEFT JOIN elections e ON r.election_id = e.id
+        LEFT JOIN precincts p ON r.precinct_id = p.id
+        LEFT JOIN candidates ca ON r.candidate_id = ca.id
+        LEFT JOIN parties pa ON r.party_id = pa.id
+        LEFT JOIN offices off ON r.office_id = off.id
+        WHERE e.id IS NULL OR p.id IS NULL OR ca.id IS NULL OR pa.id IS NULL OR off.id IS NULL
+        """,
+    },
+    {
+        'name': 'orphan_registration',
+        'severity': 'error',
+        'description': "Rows in 'registration' referencing a missing election, precinct or party.",
+        'sql': """
+        SELECT reg.id, reg.election_id, reg.precinct_id, reg.party_id
+        FROM registration reg
+        LEFT JOIN elections e ON reg.election_id = e.id
+        LEFT JOIN precincts p ON reg.precinct_id = p.id
+        LEFT JOIN parties pa ON reg.party_id = pa.id
+        WHERE e.id IS NULL OR p.id IS NULL OR pa.id IS NULL
+        """,
+    },
+    {
+        'name': 'orphan_precincts',
+        'severity': 'error',
+        'description': "Precincts referencing a missing county.",
+        'sql': """
+        SELECT p.id, p.county_id, p.precinct_code
+        FROM precincts p
+        LEFT JOIN counties co ON p.county_id = co.id
+        WHERE co.id IS NULL
+        """,
+    },
+    {
+        'name': 'duplicate_results',
+        'severity': 'error',
+        'description': "Results loaded more than once for the same election, precinct, candidate, party and office.",
+        'sql': """
+        SELECT election_id, precinct_id, candidate_id, party_id, office_id,
+               COUNT(*) AS copies, MIN(id) AS first_id, MAX(id) AS last_id
+        FROM results
+        GROUP BY election_id, precinct_id, candidate_id, party_id, office_id
+        HAVING COUNT(*) > 1
+        """,
+    },
+    {
+        'name': 'votes_exceed_registration',
+        'severity': 'error',
+        'description': "Total votes cast for an office in a precinct exceed the precinct's registered voters.",
+        'sql': """
+        WITH votes AS (
+            SELECT election_id, precinct_id, office_id, SUM(vote_total) AS votes
+            FROM results
+            GROUP BY election_id, precinct_id, office_id
+        ), registered AS (
+            SELECT election_id, precinct_id, SUM(registered_voters) AS registered_voters
+            FROM registration
+            GROUP BY election_id, precinct_id
+        )
+        SELECT e.year, co.county_code, co.name AS county_name, p.precinct_code,
+               off.office_code, v.votes, reg.registered_voters,
+               ROUND(CAST(v.votes AS REAL) / reg.registered_voters, 3) AS turnout
+        FROM votes v
+        JOIN registered reg ON v.election_id = reg.election_id AND v.precinct_id = reg.precinct_id
+        JOIN elections e ON v.election_id = e.id
+        JOIN precincts p ON v.precinct_id = p.id
+        JOIN counties co ON p.county_id = co.id
+        JOIN offices off ON v.office_id = off.id
+        WHERE v.votes > reg.registered_voters
+        ORDER BY turnout DESC
+        """,
+    },
+    {
+        'name': 'registration_jumps',
+        'severity': 'warning',
+        'description': "Precinct registration changing by more than {:.0%} between consecutive elections.".format(
+            REGISTRATION_JUMP_THRESHOLD),
+        'sql': """
+        WITH totals AS (
+            SELECT reg.precinct_id, e.year, SUM(reg.registered_voters) AS registered_voters
+            FROM registration reg
+            JOIN elections e ON reg.election_id = e.id
+            GROUP BY reg.precinct_id, e.year
+        ), changes AS (
+            SELECT precinct_id, year, registered_voters,
+                   LAG(year) OVER w AS previous_year,
+                   LAG(registered_voters) OVER w AS previous_registered_voters
+            FROM totals
+            WINDOW w AS (PARTITION BY precinct_id ORDER BY year)
+        )
+        SELECT co.county_code, co.name AS county_name, p.precinct_code,
+               ch.previous_year, ch.year, ch.previous_registered_voters, ch.registered_voters
+        FROM changes ch
+        JOIN precincts p ON ch.precinct_id = p.id
+        JOIN counties co ON p.county_id = co.id
+        WHERE ch.previous_registered_voters IS NOT NULL
+          AND MAX(ch.registered_voters, ch.previous_registered_voters) >= ?
+          AND ABS(ch.registered_voters - ch.previous_registered_voters) > ? * ch.previous_registered_voters
+        ORDER BY ABS(ch.registered_voters - ch.previous_registered_voters) DESC
+        """,
+        'params': (REGISTRATION_JUMP_MIN_VOTERS, REGISTRATION_JUMP_THRESHOLD),
+    },
+    {
+        'name': 'unknown_county_codes',
+        'severity': 'error',
+        'description': "Counties whose code is not in the Department of State county table (01-67). "
+                       "Counties holding only placeholder precincts are reported by placeholder_precincts instead.",
+        'sql': """
+        SELECT co.id, co.county_code, co.name, COUNT(p.id) AS precincts
+        FROM counties co
+        LEFT JOIN precincts p ON p.county_id = co.id
+        WHERE co.county_code NOT IN ({})
+        GROUP BY co.id
+        HAVING COUNT(p.id) = 0 OR SUM(p.precinct_code NOT IN ({})) > 0
+        """.format(', '.join('?' for _ in COUNTY_MAP), ', '.join('?' for _ in PLACEHOLDER_PRECINCT_CODES)),
+        'params': tuple(COUNTY_MAP) + PLACEHOLDER_PRECINCT_CODES,
+    },
+    {
+        'name': 'placeholder_precincts',
+        'severity': 'warning',
+        'description': "Placeholder precinct codes (e.g. 99999) loaded as real precincts.",
+        'sql': """
+        SELECT p.id, co.county_code, p.precinct_code, p.municipality_name
+        FROM precincts p
+        JOIN counties co ON p.county_id = co.id
+        WHERE p.precinct_code IN ({})
+        """.format(', '.join('?' for _ in PLACEHOLDER_PRECINCT_CODES)),
+        'params': PLACEHOLDER_PRECINCT_CODES,
+    },
+]
+
+def run_check(db_path, check):
+    """
+    Runs a single check on its own read-only connection.
+    The violation count is computed by a window over the full result set so
+    the check is still one pass, while only SAMPLE_SIZE rows are fetched.
+    """
+    start = time.perf_counter()
+    query = f"SELECT *, COUNT(*) OVER () AS violation_count FROM ({check['sql']}) LIMIT ?"
+    params = tuple(check.get('params', ())) + (SAMPLE_SIZE,)
+
+    result = {
+        'name': check['name'],
+        'severity': check['severity'],
+        'description': check['description'],
+    }
+    try:
+        with sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True) as conn:
+            cursor = conn.execute(query, params)
+            columns = [d[0] for d in cursor.description][:-1]
+            rows = cursor.fetchall()
+        violation_count = rows[0][-1] if rows else 0
+        result.update({
+            'passed': violation_count == 0,
+            'violation_count': violation_count,
+            'sample': [dict(zip(columns, row[:-1])) for row in rows],
+        })
+    except sqlite3.Error as e:
+        result.update({'passed': False, 'violation_count': None, 'error': str(e), 'sample': []})
+    result['elapsed_seconds'] = round(time.perf_counter() - start, 4)
+    return result
+
+def run_validation(db_path=DB_PATH, checks=CHECKS, max_workers=None):
+    """
+    Runs every check in the catalog in parallel and returns a report dict.
+    The report passes when no check of severity 'error' found violations.
+    """
+    start = time.perf_counter()
+    max_workers = max_workers or min(len(checks), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda check: run_check(db_path, check), checks))
+
+    return {
+        'database': os.path.abspath(db_path),
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'elapsed_seconds': round(time.perf_counter() - start, 4),
+        'passed': all(r['passed'] for r in results if r['severity'] == 'error'),
+        'checks': results,
+    }
+
+def write_report(report, report_path=REPORT_PATH):
+    """Writes the validation report as JSON."""
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+def print_summary(report):
+    """Prints a one-line-per-check summary of a validation report."""
+    for check in report['checks']:
+        if 'error' in check:
+            status = 'ERROR'
+            detail = check['error']
+        else:
+            status = 'PASS' if check['passed'] else {'error': 'FAIL', 'warning': 'WARN'}[check['severity']]
+            detail = f"{check['violation_count']} violations"
+        print(f"  [{status:5}] {check['name']}: {detail} ({check['elapsed_seconds']:.3f}s)")
+    print(f"Validation {'passed' if report['passed'] else 'FAILED'} in {report['elapsed_seconds']:.3f}s")
+
+def validate_data():
+    """Runs all checks, writes the JSON report and returns whether it passed."""
+    if not os.path.exists(DB_PATH):
+        print(f"Database file not found at {DB_PATH}")
+        return False
+
+    report = run_validation()
+    write_report(report)
+    print_summary(report)
+    print(f"Report written to {REPORT_PATH}")
+    return report['passed']
+
+if __name__ == '__main__':
+    sys.exit(0 if validate_data() else 1)
@@ -2,6 +2,8 @@ import sqlite3
 import os
 import pandas as pd
 
+from validate_data import run_validation, write_report, print_summary, REPORT_PATH
+
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'election_data.db')
 
 def verify_data():
@@ -60,7 +62,14 @@ def verify_data():
             print(f"An error occurred while fetching data with pandas: {e}")
             print("This might be because pandas is not installed. Try 'pip install pandas'.")
 
-        print("\n--- Verification Complete ---")
+    # 3. Run the integrity and plausibility checks
+    print("\n3. Integrity and plausibility checks:")
+    report = run_validation(DB_PATH)
+    write_report(report)
+    print_summary(report)
+    print(f"Full report written to {REPORT_PATH}")
+
+    print("\n--- Verification Complete ---")
 
 if __name__ == '__main__':
     verify_data()
\ No newline at end of file